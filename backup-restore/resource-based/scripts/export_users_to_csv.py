@@ -32,6 +32,27 @@ from typing import Dict, List, Optional, Set
 import requests
 
 
+# Standard profile fields (not custom attributes)
+STANDARD_FIELDS = frozenset({
+    'login', 'email', 'firstName', 'lastName', 'middleName', 'honorificPrefix',
+    'honorificSuffix', 'title', 'displayName', 'nickName', 'profileUrl',
+    'secondEmail', 'mobilePhone', 'primaryPhone', 'streetAddress', 'city',
+    'state', 'zipCode', 'countryCode', 'postalAddress', 'preferredLanguage',
+    'locale', 'timezone', 'userType', 'employeeNumber', 'costCenter',
+    'organization', 'division', 'department', 'managerId', 'manager'
+})
+
+# Report processing progress every N users (verbose mode reports more often)
+PROGRESS_INTERVAL = 500
+VERBOSE_PROGRESS_INTERVAL = 50
+
+# CSV columns, in the order rows are written
+CSV_FIELDNAMES = (
+    'email', 'first_name', 'last_name', 'login', 'status',
+    'department', 'title', 'manager_email', 'groups', 'custom_profile_attributes'
+)
+
+
 class OktaClient:
     """Client for Okta API operations."""
 
@@ -120,20 +141,20 @@ class OktaClient:
 
     def get_group_members(self, group_name: str) -> Set[str]:
         """Get user IDs in a specific group."""
-        # First find the group
+        # First find the group (exact name match via search; filter only
+        # supports id/type/lastUpdated; requests URL-encodes params)
         url = f"{self.api_url}/groups"
-        params = {"q": group_name, "limit": 1}
+        escaped_name = group_name.replace('\\', '\\\\').replace('"', '\\"')
+        params = {"search": f'profile.name eq "{escaped_name}"', "limit": 1}
         response = self._make_request("GET", url, params=params)
 
         if not response.ok:
+            print(f"  Error: Group lookup for '{group_name}' failed: "
+                  f"{response.status_code} - {response.text}")
             return set()
 
         groups = response.json()
-        group = None
-        for g in groups:
-            if g.get('profile', {}).get('name') == group_name:
-                group = g
-                break
+        group = groups[0] if groups else None
 
         if not group:
             print(f"  Warning: Group '{group_name}' not found")
@@ -162,7 +183,7 @@ class OktaClient:
         url = f"{self.api_url}/users/{user_id}/linkedObjects/manager"
         response = self._make_request("GET", url)
 
-        if not response.ok or response.status_code == 404:
+        if not response.ok:
             return None
 
         managers = response.json()
@@ -189,13 +210,13 @@ def escape_csv_json(value: str) -> str:
     return value.replace('"', '""')
 
 
-def build_custom_attributes(profile: Dict, standard_fields: Set[str]) -> str:
+def build_custom_attributes(profile: Dict) -> str:
     """Extract custom attributes as JSON string."""
-    custom = {}
-    for key, value in profile.items():
-        if key not in standard_fields and value is not None:
-            custom[key] = value
+    custom_keys = profile.keys() - STANDARD_FIELDS
+    if not custom_keys:
+        return ""
 
+    custom = {k: profile[k] for k in sorted(custom_keys) if profile[k] is not None}
     if not custom:
         return ""
 
@@ -211,19 +232,10 @@ def export_users_to_csv(
     include_groups: bool = True,
     include_manager: bool = True,
     filter_group: Optional[str] = None,
-    verbose: bool = False
+    verbose: bool = False,
+    linked_managers: bool = True
 ):
     """Export users to CSV file."""
-    # Standard profile fields (not custom attributes)
-    standard_fields = {
-        'login', 'email', 'firstName', 'lastName', 'middleName', 'honorificPrefix',
-        'honorificSuffix', 'title', 'displayName', 'nickName', 'profileUrl',
-        'secondEmail', 'mobilePhone', 'primaryPhone', 'streetAddress', 'city',
-        'state', 'zipCode', 'countryCode', 'postalAddress', 'preferredLanguage',
-        'locale', 'timezone', 'userType', 'employeeNumber', 'costCenter',
-        'organization', 'division', 'department', 'managerId', 'manager'
-    }
-
     # Get users
     users = client.get_all_users(include_deprovisioned)
 
@@ -242,69 +254,68 @@ def export_users_to_csv(
     print("\nProcessing user details...")
     user_data = []
     user_id_to_email = {u.get('id'): u.get('profile', {}).get('email', '') for u in users}
+    with_manager = with_groups = with_custom = 0
+    total = len(users)
+    progress_interval = VERBOSE_PROGRESS_INTERVAL if verbose else PROGRESS_INTERVAL
 
     for i, user in enumerate(users, 1):
         profile = user.get('profile', {})
         user_id = user.get('id')
 
-        row = {
-            'email': profile.get('email', ''),
-            'first_name': profile.get('firstName', ''),
-            'last_name': profile.get('lastName', ''),
-            'login': profile.get('login', ''),
-            'status': user.get('status', 'ACTIVE'),
-            'department': profile.get('department', ''),
-            'title': profile.get('title', ''),
-            'manager_email': '',
-            'groups': '',
-            'custom_profile_attributes': '',
-        }
-
         # Get manager email
+        manager_email = ''
         if include_manager:
             manager_id = profile.get('managerId')
             if manager_id and manager_id in user_id_to_email:
-                row['manager_email'] = user_id_to_email[manager_id]
-            else:
-                # Try linked objects API
-                manager_email = client.get_user_manager(user_id)
-                if manager_email:
-                    row['manager_email'] = manager_email
+                manager_email = user_id_to_email[manager_id]
+            elif manager_id or linked_managers:
+                # Manager outside the exported set, or defined only as a
+                # Linked Object (which doesn't populate managerId)
+                manager_email = client.get_user_manager(user_id) or ''
 
         # Get groups
+        groups_str = ''
         if include_groups:
-            groups = client.get_user_groups(user_id)
-            row['groups'] = ','.join(sorted(groups))
+            groups_str = ','.join(sorted(client.get_user_groups(user_id)))
 
         # Get custom attributes
-        custom_attrs = build_custom_attributes(profile, standard_fields)
-        row['custom_profile_attributes'] = custom_attrs
-
-        user_data.append(row)
-
-        if verbose or i % 50 == 0:
-            print(f"  Processed {i}/{len(users)} users")
+        custom_attrs = build_custom_attributes(profile)
+
+        # Row order must match CSV_FIELDNAMES
+        user_data.append((
+            profile.get('email', ''),
+            profile.get('firstName', ''),
+            profile.get('lastName', ''),
+            profile.get('login', ''),
+            user.get('status', 'ACTIVE'),
+            profile.get('department', ''),
+            profile.get('title', ''),
+            manager_email,
+            groups_str,
+            custom_attrs,
+        ))
+
+        with_manager += bool(manager_email)
+        with_groups += bool(groups_str)
+        with_custom += bool(custom_attrs)
+
+        if i % progress_interval == 0 or i == total:
+            print(f"  Processed {i}/{total} users")
 
     # Write CSV
     print(f"\nWriting to {output_file}...")
     os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
 
-    fieldnames = [
-        'email', 'first_name', 'last_name', 'login', 'status',
-        'department', 'title', 'manager_email', 'groups', 'custom_profile_attributes'
-    ]
-
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL)
-        writer.writeheader()
+        writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(CSV_FIELDNAMES)
 
         # Write header comment
         f.write('# Exported from Okta org: ' + client.org_name + '\n')
         f.write('# Export date: ' + time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()) + '\n')
         f.write('# Total users: ' + str(len(user_data)) + '\n')
 
-        for row in user_data:
-            writer.writerow(row)
+        writer.writerows(user_data)
 
     # Summary
     print(f"\nExport complete!")
@@ -312,10 +323,6 @@ def export_users_to_csv(
     print(f"  Output file: {output_file}")
 
     # Count statistics
-    with_manager = sum(1 for u in user_data if u['manager_email'])
-    with_groups = sum(1 for u in user_data if u['groups'])
-    with_custom = sum(1 for u in user_data if u['custom_profile_attributes'])
-
     print(f"  Users with manager: {with_manager}")
     print(f"  Users with groups: {with_groups}")
     print(f"  Users with custom attributes: {with_custom}")
@@ -335,6 +342,9 @@ def main():
                         help="Skip fetching group memberships (faster)")
     parser.add_argument("--no-manager", action="store_true",
                         help="Skip fetching manager relationships (faster)")
+    parser.add_argument("--no-linked-managers", action="store_true",
+                        help="Only resolve managers from profile.managerId; skips one "
+                             "Linked Objects request per user without it (faster)")
     parser.add_argument("--group", type=str,
                         help="Only export users from this group")
     parser.add_argument("--verbose", "-v", action="store_true",
@@ -362,7 +372,8 @@ def main():
         include_groups=not args.no_groups,
         include_manager=not args.no_manager,
         filter_group=args.group,
-        verbose=args.verbose
+        verbose=args.verbose,
+        linked_managers=not args.no_linked_managers
     )
 
     if count > 0:
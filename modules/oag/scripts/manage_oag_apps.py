@@ -14,15 +14,25 @@ Environment Variables:
     OAG_CLIENT_ID: Client ID (can also be in config)
     OAG_PRIVATE_KEY_PATH: Path to private key
     OAG_PRIVATE_KEY: Private key content
+    OAG_JWT_ALGORITHM: JWT signing algorithm, RS256 or ES256 (can also be in config)
+    OAG_TOKEN_CACHE: File to reuse the access token across runs (can also be in config)
 """
 
 import os
 import sys
 import json
 import argparse
+import functools
+import itertools
 import logging
+from collections import Counter
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, TextIO
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional - falls back to the json module
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
@@ -39,8 +49,83 @@ logger = logging.getLogger(__name__)
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """Load configuration from JSON file."""
-    with open(config_path, 'r') as f:
-        return json.load(f)
+    with open(config_path, 'rb') as f:
+        data = f.read()
+    config = orjson.loads(data) if orjson is not None else json.loads(data)
+    validate_config(config)
+    return config
+
+
+def validate_config(config: Any) -> None:
+    """
+    Check the configuration shape before any API call is made.
+
+    Catches missing required keys up front rather than part-way through a
+    deploy, after some applications have already been changed.
+
+    Raises:
+        ValueError: Describing the first problem found
+    """
+    if not isinstance(config, dict):
+        raise ValueError("configuration must be a JSON object")
+    if not isinstance(config.get('gateway', {}), dict):
+        raise ValueError("'gateway' must be an object")
+
+    apps = config.get('applications', [])
+    if not isinstance(apps, list):
+        raise ValueError("'applications' must be a list")
+
+    for i, app in enumerate(apps):
+        where = f"applications[{i}]"
+        if not isinstance(app, dict):
+            raise ValueError(f"{where} must be an object")
+        if not isinstance(app.get('label'), str):
+            raise ValueError(f"{where} is missing 'label'")
+        where = f"application '{app['label']}'"
+
+        for j, resource in enumerate(app.get('protected_resources') or []):
+            if not isinstance(resource, dict) or 'url' not in resource:
+                raise ValueError(f"{where} protected_resources[{j}] is missing 'url'")
+
+        for j, attr in enumerate(app.get('attributes') or []):
+            if not isinstance(attr, dict):
+                raise ValueError(f"{where} attributes[{j}] must be an object")
+            for key in ('field', 'name'):
+                if key not in attr:
+                    raise ValueError(f"{where} attributes[{j}] is missing '{key}'")
+
+
+def dump_json(data: Any) -> str:
+    """Serialize data as JSON indented by two spaces."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(data, indent=2)
+
+
+def write_import(
+    out: TextIO,
+    gateway: Dict[str, Any],
+    app_configs: Iterable[Dict[str, Any]]
+) -> int:
+    """
+    Stream an import document to out one application at a time.
+
+    Produces the same layout as dump_json({'gateway': ..., 'applications': [...]})
+    without building the full document in memory.
+
+    Returns:
+        Number of applications written
+    """
+    out.write('{\n  "gateway": ' + dump_json(gateway).replace('\n', '\n  '))
+    out.write(',\n  "applications": [')
+
+    count = 0
+    for app_config in app_configs:
+        out.write((',\n    ' if count else '\n    ') + dump_json(app_config).replace('\n', '\n    '))
+        count += 1
+
+    out.write('\n  ]\n}' if count else ']\n}')
+    return count
 
 
 def get_client(config: Dict[str, Any]) -> OAGClient:
@@ -57,6 +142,8 @@ def get_client(config: Dict[str, Any]) -> OAGClient:
     private_key_path = gateway_config.get('private_key_path') or os.environ.get('OAG_PRIVATE_KEY_PATH')
     private_key = gateway_config.get('private_key') or os.environ.get('OAG_PRIVATE_KEY')
     verify_ssl = gateway_config.get('verify_ssl', True)
+    algorithm = gateway_config.get('algorithm') or os.environ.get('OAG_JWT_ALGORITHM') or 'RS256'
+    token_cache_path = gateway_config.get('token_cache_path') or os.environ.get('OAG_TOKEN_CACHE')
 
     if not hostname:
         raise ValueError("OAG hostname not configured (config.gateway.hostname or OAG_HOSTNAME)")
@@ -70,7 +157,9 @@ def get_client(config: Dict[str, Any]) -> OAGClient:
         client_id=client_id,
         private_key_path=private_key_path,
         private_key=private_key,
-        verify_ssl=verify_ssl
+        verify_ssl=verify_ssl,
+        algorithm=algorithm,
+        token_cache_path=token_cache_path
     )
 
 
@@ -82,16 +171,15 @@ def action_list(manager: OAGApplicationManager, args: argparse.Namespace) -> Non
         print("No applications found")
         return
 
-    print(f"\n{'Label':<40} {'Public Domain':<40} {'ID'}")
-    print("-" * 100)
-
-    for app in apps:
-        label = app.get('label', 'N/A')[:39]
-        domain = app.get('publicDomain', 'N/A')[:39]
-        app_id = app.get('id', 'N/A')
-        print(f"{label:<40} {domain:<40} {app_id}")
+    lines = [f"\n{'Label':<40} {'Public Domain':<40} {'ID'}", "-" * 100]
+    lines.extend(
+        f"{app.get('label', 'N/A')[:39]:<40} {app.get('publicDomain', 'N/A')[:39]:<40} {app.get('id', 'N/A')}"
+        for app in apps
+    )
+    lines.append(f"\nTotal: {len(apps)} applications\n")
 
-    print(f"\nTotal: {len(apps)} applications")
+    # One write instead of a print per row
+    sys.stdout.write("\n".join(lines))
 
 
 def action_deploy(
@@ -113,43 +201,36 @@ def action_deploy(
             print(f"Application '{args.app}' not found in configuration")
             return
 
-    results = []
-    for app_config in apps:
-        try:
-            result = manager.deploy_application(app_config, dry_run=args.dry_run)
-            results.append(result)
-
-            if args.dry_run:
-                action = f"Would {result['action']}"
-            else:
-                action = f"{result['action'].capitalize()}d"
-
-            print(f"\n{action}: {result['label']}")
-
-            if result['app_id']:
-                print(f"  App ID: {result['app_id']}")
-
-            if result['attributes']['added']:
-                print(f"  Attributes added: {', '.join(result['attributes']['added'])}")
-            if result['attributes']['updated']:
-                print(f"  Attributes updated: {', '.join(result['attributes']['updated'])}")
-            if result['attributes']['deleted']:
-                print(f"  Attributes deleted: {', '.join(result['attributes']['deleted'])}")
-
-        except Exception as e:
-            logger.error(f"Failed to deploy {app_config.get('label')}: {e}")
-            results.append({
-                'label': app_config.get('label'),
-                'action': 'error',
-                'error': str(e)
-            })
+    results = manager.deploy_applications(apps, dry_run=args.dry_run)
+
+    for result in results:
+        if result['action'] == 'error':
+            continue
+
+        if args.dry_run:
+            action = f"Would {result['action']}"
+        else:
+            action = f"{result['action'].capitalize()}d"
+
+        print(f"\n{action}: {result['label']}")
+
+        if result['app_id']:
+            print(f"  App ID: {result['app_id']}")
+
+        if result['attributes']['added']:
+            print(f"  Attributes added: {', '.join(result['attributes']['added'])}")
+        if result['attributes']['updated']:
+            print(f"  Attributes updated: {', '.join(result['attributes']['updated'])}")
+        if result['attributes']['deleted']:
+            print(f"  Attributes deleted: {', '.join(result['attributes']['deleted'])}")
 
     # Summary
-    created = sum(1 for r in results if r.get('action') == 'create')
-    updated = sum(1 for r in results if r.get('action') == 'update')
-    errors = sum(1 for r in results if r.get('action') == 'error')
+    counts = Counter(r.get('action') for r in results)
 
-    print(f"\n{'Dry run ' if args.dry_run else ''}Summary: {created} created, {updated} updated, {errors} errors")
+    print(
+        f"\n{'Dry run ' if args.dry_run else ''}Summary: {counts['create']} created, "
+        f"{counts['update']} updated, {counts['error']} errors"
+    )
 
 
 def action_delete(manager: OAGApplicationManager, args: argparse.Namespace) -> None:
@@ -224,25 +305,25 @@ def action_import(
     args: argparse.Namespace
 ) -> None:
     """Import applications from OAG to configuration format."""
-    apps = manager.import_applications()
+    app_configs = manager.iter_application_configs()
 
-    if not apps:
+    # Peek so nothing is written when there is nothing to import
+    first = next(app_configs, None)
+    if first is None:
         print("No applications found to import")
         return
+    app_configs = itertools.chain([first], app_configs)
 
-    # Build output config
-    output = {
-        'gateway': config.get('gateway', {}),
-        'applications': apps
-    }
+    gateway = config.get('gateway', {})
 
     # Write to file or stdout
     if args.output:
-        with open(args.output, 'w') as f:
-            json.dump(output, f, indent=2)
-        print(f"Exported {len(apps)} applications to {args.output}")
+        with open(args.output, 'w', encoding='utf-8') as f:
+            count = write_import(f, gateway, app_configs)
+        print(f"Exported {count} applications to {args.output}")
     else:
-        print(json.dumps(output, indent=2))
+        write_import(sys.stdout, gateway, app_configs)
+        sys.stdout.write('\n')
 
 
 def action_health(client: OAGClient, args: argparse.Namespace) -> None:
@@ -258,7 +339,9 @@ def action_health(client: OAGClient, args: argparse.Namespace) -> None:
         print(f"  Error: {status['error']}")
 
 
-def main():
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser once and reuse it."""
     parser = argparse.ArgumentParser(
         description='Manage Okta Access Gateway Applications',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -325,7 +408,11 @@ Examples:
         help='Enable verbose logging'
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    args = _build_parser().parse_args()
 
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
@@ -6,12 +6,80 @@ header-based apps, attributes, and policies.
 """
 
 import logging
-from typing import Optional, Dict, Any, List
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Dict, Any, Callable, Iterator, List
+
+import requests
 
 from .oag_client import OAGClient, OAGAPIError
 
 logger = logging.getLogger(__name__)
 
+# (config key, API key, default) for attribute fields; None marks a required key.
+# Drives both the API payloads and the comparison done during sync.
+_CANON_KEYS = (
+    ('source', 'dataSource', 'IDP'),
+    ('field', 'field', None),
+    ('type', 'targetType', 'Header'),
+    ('name', 'name', None),
+)
+
+
+# Health check payload used for any field the configuration leaves out
+_HC_DEFAULTS = {
+    'enabled': True,
+    'path': '/health',
+    'method': 'GET',
+    'expectedStatus': 200,
+    'interval': 10,
+    'timeout': 1,
+    'unhealthyThreshold': 3,
+    'healthyThreshold': 2,
+}
+
+# Configuration (snake_case) to API (camelCase) health check keys
+_HC_KEYS = {
+    'path': 'path',
+    'method': 'method',
+    'expected_status': 'expectedStatus',
+    'interval': 'interval',
+    'timeout': 'timeout',
+    'unhealthy_threshold': 'unhealthyThreshold',
+    'healthy_threshold': 'healthyThreshold',
+}
+
+
+def _build_attr_payload(attr: Dict[str, Any]) -> Dict[str, Any]:
+    """API payload for a new attribute, filling in the default source and type."""
+    payload = {
+        api_key: attr[key] if default is None else attr.get(key, default)
+        for key, api_key, default in _CANON_KEYS
+    }
+    if attr.get('value'):
+        payload['value'] = attr['value']
+    return payload
+
+
+def _build_attr_update_payload(attr: Dict[str, Any]) -> Dict[str, Any]:
+    """API payload for an attribute update, containing only the keys given."""
+    payload = {api_key: attr[key] for key, api_key, _ in _CANON_KEYS if key in attr}
+    if 'value' in attr:
+        payload['value'] = attr['value']
+    return payload
+
+
+def _canon_config_attr(attr: Dict[str, Any]) -> tuple:
+    """Comparable form of an attribute from configuration."""
+    return tuple(attr.get(key, default) for key, _, default in _CANON_KEYS)
+
+
+def _canon_api_attr(attr: Dict[str, Any]) -> tuple:
+    """Comparable form of an attribute returned by the API."""
+    return tuple(attr.get(api_key, default) for _, api_key, default in _CANON_KEYS)
+
 
 class OAGApplicationManager:
     """
@@ -24,6 +92,19 @@ class OAGApplicationManager:
     - Access policies
     """
 
+    # Seconds a fetched application list is reused before refetching
+    APPS_CACHE_TTL = 300
+
+    # Applications deployed concurrently by deploy_applications; defined on
+    # the client, whose connection pool is sized from these two
+    DEPLOY_WORKERS = OAGClient.DEPLOY_WORKERS
+
+    # Concurrent attribute requests within a single application
+    ATTRIBUTE_WORKERS = OAGClient.ATTRIBUTE_WORKERS
+
+    # Concurrent attribute list requests during import
+    IMPORT_WORKERS = 16
+
     def __init__(self, client: OAGClient):
         """
         Initialize application manager.
@@ -33,6 +114,17 @@ class OAGApplicationManager:
         """
         self.client = client
 
+        # Cached application list, dropped whenever an application changes
+        self._apps_cache = None
+        self._apps_cache_time = 0.0
+        self._apps_by_label = {}
+
+        # Attribute lists by app ID, dropped when that app's attributes change
+        self._attrs_cache = {}
+
+        # Cleared if the server rejects the label query parameter
+        self._label_filter_supported = True
+
     # ==================== Application CRUD ====================
 
     def list_applications(self) -> List[Dict[str, Any]]:
@@ -42,8 +134,26 @@ class OAGApplicationManager:
         Returns:
             List of application objects
         """
+        if (self._apps_cache is not None
+                and time.monotonic() - self._apps_cache_time < self.APPS_CACHE_TTL):
+            return self._apps_cache
+
         response = self.client.get('/api/v2/apps')
-        return response.get('data', response) if isinstance(response, dict) else response
+        apps = response.get('data', response) if isinstance(response, dict) else response
+
+        # Index by label once per fetch; the first app wins on duplicate labels
+        apps_by_label = {}
+        for app in apps:
+            apps_by_label.setdefault(app.get('label'), app)
+
+        self._apps_by_label = apps_by_label
+        self._apps_cache = apps
+        self._apps_cache_time = time.monotonic()
+        return apps
+
+    def _invalidate_apps_cache(self) -> None:
+        """Drop the cached application list after a create, update or delete."""
+        self._apps_cache = None
 
     def get_application(self, app_id: str) -> Dict[str, Any]:
         """
@@ -67,12 +177,50 @@ class OAGApplicationManager:
         Returns:
             Application object or None if not found
         """
-        apps = self.list_applications()
+        # A fresh cached list answers without a request
+        if (not self._label_filter_supported
+                or (self._apps_cache is not None
+                    and time.monotonic() - self._apps_cache_time < self.APPS_CACHE_TTL)):
+            return self.get_application_by_name_cached(name)
+
+        # Ask the server for just this label rather than transferring every app
+        try:
+            response = self.client.get('/api/v2/apps', params={'label': name})
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 400:
+                raise
+            logger.debug("Label filter not supported, falling back to full application list")
+            self._label_filter_supported = False
+            return self.get_application_by_name_cached(name)
+
+        apps = response.get('data', response) if isinstance(response, dict) else response
+
+        # Match exactly, in case the server ignores the filter or matches loosely
         for app in apps:
             if app.get('label') == name:
                 return app
         return None
 
+    def get_application_by_name_cached(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Find an application by label using the cached application list.
+
+        Preferable when looking up many labels, since the list is fetched
+        at most once per APPS_CACHE_TTL.
+
+        Args:
+            name: Application label
+
+        Returns:
+            Application object or None if not found
+        """
+        return self._get_apps_by_label().get(name)
+
+    def _get_apps_by_label(self) -> Dict[str, Dict[str, Any]]:
+        """Return the label index for the current (possibly cached) application list."""
+        self.list_applications()
+        return self._apps_by_label
+
     def create_application(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new header-based application.
@@ -110,7 +258,9 @@ class OAGApplicationManager:
             payload['group'] = config['group']
 
         logger.info(f"Creating application: {config['label']}")
-        return self.client.post('/api/v2/apps', payload)
+        app = self.client.post('/api/v2/apps', payload)
+        self._invalidate_apps_cache()
+        return app
 
     def update_application(self, app_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -139,7 +289,9 @@ class OAGApplicationManager:
             payload['group'] = config['group']
 
         logger.info(f"Updating application: {app_id}")
-        return self.client.put(f'/api/v2/apps/{app_id}', payload)
+        app = self.client.put(f'/api/v2/apps/{app_id}', payload)
+        self._invalidate_apps_cache()
+        return app
 
     def delete_application(self, app_id: str) -> bool:
         """
@@ -152,7 +304,10 @@ class OAGApplicationManager:
             True if successful
         """
         logger.info(f"Deleting application: {app_id}")
-        return self.client.delete(f'/api/v2/apps/{app_id}')
+        deleted = self.client.delete(f'/api/v2/apps/{app_id}')
+        self._invalidate_apps_cache()
+        self._attrs_cache.pop(app_id, None)
+        return deleted
 
     # ==================== Attributes ====================
 
@@ -166,8 +321,14 @@ class OAGApplicationManager:
         Returns:
             List of attribute objects
         """
+        attrs = self._attrs_cache.get(app_id)
+        if attrs is not None:
+            return attrs
+
         response = self.client.get(f'/api/v2/apps/{app_id}/attributes')
-        return response.get('data', response) if isinstance(response, dict) else response
+        attrs = response.get('data', response) if isinstance(response, dict) else response
+        self._attrs_cache[app_id] = attrs
+        return attrs
 
     def add_attribute(self, app_id: str, attribute: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -185,18 +346,12 @@ class OAGApplicationManager:
         Returns:
             Created attribute object
         """
-        payload = {
-            'dataSource': attribute.get('source', 'IDP'),
-            'field': attribute['field'],
-            'targetType': attribute.get('type', 'Header'),
-            'name': attribute['name']
-        }
-
-        if attribute.get('value'):
-            payload['value'] = attribute['value']
+        payload = _build_attr_payload(attribute)
 
         logger.info(f"Adding attribute {attribute['name']} to app {app_id}")
-        return self.client.post(f'/api/v2/apps/{app_id}/attributes', payload)
+        created = self.client.post(f'/api/v2/apps/{app_id}/attributes', payload)
+        self._attrs_cache.pop(app_id, None)
+        return created
 
     def update_attribute(
         self,
@@ -215,20 +370,10 @@ class OAGApplicationManager:
         Returns:
             Updated attribute object
         """
-        payload = {}
-
-        if 'source' in attribute:
-            payload['dataSource'] = attribute['source']
-        if 'field' in attribute:
-            payload['field'] = attribute['field']
-        if 'type' in attribute:
-            payload['targetType'] = attribute['type']
-        if 'name' in attribute:
-            payload['name'] = attribute['name']
-        if 'value' in attribute:
-            payload['value'] = attribute['value']
-
-        return self.client.put(f'/api/v2/apps/{app_id}/attributes/{attribute_id}', payload)
+        payload = _build_attr_update_payload(attribute)
+        updated = self.client.put(f'/api/v2/apps/{app_id}/attributes/{attribute_id}', payload)
+        self._attrs_cache.pop(app_id, None)
+        return updated
 
     def delete_attribute(self, app_id: str, attribute_id: str) -> bool:
         """
@@ -242,7 +387,9 @@ class OAGApplicationManager:
             True if successful
         """
         logger.info(f"Deleting attribute {attribute_id} from app {app_id}")
-        return self.client.delete(f'/api/v2/apps/{app_id}/attributes/{attribute_id}')
+        deleted = self.client.delete(f'/api/v2/apps/{app_id}/attributes/{attribute_id}')
+        self._attrs_cache.pop(app_id, None)
+        return deleted
 
     def sync_attributes(
         self,
@@ -265,30 +412,33 @@ class OAGApplicationManager:
         added = []
         updated = []
         deleted = []
+        calls = []
 
-        # Track desired attribute names
-        desired_names = {attr['name'] for attr in desired_attributes}
+        # Desired attributes by name; a repeated name keeps its last definition
+        desired_by_name = {attr['name']: attr for attr in desired_attributes}
 
         # Add or update attributes
-        for attr in desired_attributes:
-            name = attr['name']
+        for name, attr in desired_by_name.items():
             if name in current_by_name:
                 # Check if update needed
                 current_attr = current_by_name[name]
                 if self._attribute_needs_update(current_attr, attr):
-                    self.update_attribute(app_id, current_attr['id'], attr)
+                    calls.append(partial(self.update_attribute, app_id, current_attr['id'], attr))
                     updated.append(name)
             else:
                 # Add new attribute
-                self.add_attribute(app_id, attr)
+                calls.append(partial(self.add_attribute, app_id, attr))
                 added.append(name)
 
         # Delete attributes not in desired state
         for name, attr in current_by_name.items():
-            if name not in desired_names:
-                self.delete_attribute(app_id, attr['id'])
+            if name not in desired_by_name:
+                calls.append(partial(self.delete_attribute, app_id, attr['id']))
                 deleted.append(name)
 
+        # Each change touches a different attribute, so they can run together
+        self._run_concurrently(calls)
+
         return {
             'added': added,
             'updated': updated,
@@ -351,7 +501,9 @@ class OAGApplicationManager:
             Updated application object
         """
         payload = {'certificateId': certificate_id}
-        return self.client.put(f'/api/v2/apps/{app_id}/certificate', payload)
+        app = self.client.put(f'/api/v2/apps/{app_id}/certificate', payload)
+        self._invalidate_apps_cache()
+        return app
 
     def list_certificates(self) -> List[Dict[str, Any]]:
         """
@@ -379,6 +531,79 @@ class OAGApplicationManager:
             config: Complete application configuration
             dry_run: Preview changes without applying
 
+        Returns:
+            Deployment result summary
+        """
+        existing = self.get_application_by_name(config['label'])
+        return self._deploy(config, existing, dry_run)
+
+    def deploy_applications(
+        self,
+        configs: List[Dict[str, Any]],
+        dry_run: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Deploy several applications concurrently.
+
+        The application list is fetched once up front, so existence checks
+        cost a single request regardless of how many apps are deployed.
+        Configs sharing a label are deployed one after another, each seeing
+        the app left by the previous one, so they never both create it.
+        A failed deploy is logged and reported as an 'error' result rather
+        than aborting the others.
+
+        Args:
+            configs: Application configurations
+            dry_run: Preview changes without applying
+
+        Returns:
+            Deployment result summaries, in the same order as configs
+        """
+        if not configs:
+            return []
+
+        existing_by_label = self._get_apps_by_label()
+
+        # Group config positions by label; each group runs sequentially
+        by_label: Dict[str, List[int]] = {}
+        for i, config in enumerate(configs):
+            by_label.setdefault(config['label'], []).append(i)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(configs)
+
+        def deploy_group(indices: List[int]) -> None:
+            for n, i in enumerate(indices):
+                config = configs[i]
+                try:
+                    existing = (existing_by_label.get(config['label']) if n == 0
+                                else self.get_application_by_name(config['label']))
+                    results[i] = self._deploy(config, existing, dry_run)
+                except Exception as e:
+                    logger.error(f"Failed to deploy {config.get('label')}: {e}")
+                    results[i] = {
+                        'label': config.get('label'),
+                        'action': 'error',
+                        'error': str(e)
+                    }
+
+        with ThreadPoolExecutor(max_workers=min(self.DEPLOY_WORKERS, len(by_label))) as executor:
+            list(executor.map(deploy_group, by_label.values()))
+        return results
+
+    def _deploy(
+        self,
+        config: Dict[str, Any],
+        existing: Optional[Dict[str, Any]],
+        dry_run: bool
+    ) -> Dict[str, Any]:
+        """
+        Create or update one application given its current state.
+
+        Args:
+            config: Complete application configuration
+            existing: Current application object, or None if it doesn't exist
+            dry_run: Preview changes without applying
+
         Returns:
             Deployment result summary
         """
@@ -390,9 +615,6 @@ class OAGApplicationManager:
             'dry_run': dry_run
         }
 
-        # Check if app exists
-        existing = self.get_application_by_name(config['label'])
-
         if existing:
             result['action'] = 'update'
             result['app_id'] = existing['id']
@@ -415,11 +637,13 @@ class OAGApplicationManager:
                 app = self.create_application(config)
                 result['app_id'] = app.get('id')
 
-                # Add attributes
+                # Add attributes; a new app has none, so they can all be created together
                 if config.get('attributes'):
-                    for attr in config['attributes']:
-                        self.add_attribute(app['id'], attr)
-                        result['attributes']['added'].append(attr['name'])
+                    self._run_concurrently([
+                        partial(self.add_attribute, app['id'], attr)
+                        for attr in config['attributes']
+                    ])
+                    result['attributes']['added'] = [attr['name'] for attr in config['attributes']]
 
                 # Add default policy if specified
                 if config.get('policy'):
@@ -437,29 +661,51 @@ class OAGApplicationManager:
         Returns:
             List of application configurations suitable for JSON export
         """
+        return list(self.iter_application_configs())
+
+    def iter_application_configs(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield each application in configuration format as it is fetched.
+
+        Lets callers write an export incrementally instead of holding
+        every application and its attributes in memory at once.
+
+        Yields:
+            Application configuration suitable for JSON export
+        """
         apps = self.list_applications()
-        configs = []
+        if not apps:
+            return
+
+        # Fetch attributes concurrently, but keep at most IMPORT_WORKERS apps in
+        # flight: the next fetch is submitted only as the oldest app is yielded
+        workers = min(self.IMPORT_WORKERS, len(apps))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque(
+                executor.submit(self._safe_list_attrs, app['id']) for app in apps[:workers]
+            )
 
-        for app in apps:
-            config = {
-                'label': app.get('label'),
-                'public_domain': app.get('publicDomain'),
-                'description': app.get('description', ''),
-                'protected_resources': [],
-                'attributes': []
-            }
+            for i, app in enumerate(apps):
+                attrs = pending.popleft().result()
+                if i + workers < len(apps):
+                    pending.append(executor.submit(self._safe_list_attrs, apps[i + workers]['id']))
+
+                config = {
+                    'label': app.get('label'),
+                    'public_domain': app.get('publicDomain'),
+                    'description': app.get('description', ''),
+                    'protected_resources': [],
+                    'attributes': []
+                }
 
-            # Get protected resources
-            if app.get('protectedResources'):
-                for resource in app['protectedResources']:
-                    config['protected_resources'].append({
-                        'url': resource.get('url'),
-                        'weight': resource.get('weight', 100)
-                    })
+                # Get protected resources
+                if app.get('protectedResources'):
+                    for resource in app['protectedResources']:
+                        config['protected_resources'].append({
+                            'url': resource.get('url'),
+                            'weight': resource.get('weight', 100)
+                        })
 
-            # Get attributes
-            try:
-                attrs = self.list_attributes(app['id'])
                 for attr in attrs:
                     config['attributes'].append({
                         'source': attr.get('dataSource', 'IDP'),
@@ -467,15 +713,48 @@ class OAGApplicationManager:
                         'type': attr.get('targetType', 'Header'),
                         'name': attr.get('name')
                     })
-            except Exception as e:
-                logger.warning(f"Failed to get attributes for {app['id']}: {e}")
-
-            configs.append(config)
 
-        return configs
+                yield config
 
     # ==================== Helper Methods ====================
 
+    def _safe_list_attrs(self, app_id: str) -> List[Dict[str, Any]]:
+        """
+        List an application's attributes, logging and returning [] on failure.
+
+        Bypasses the attribute cache so an export does not retain every
+        application's attributes after they have been yielded.
+
+        Args:
+            app_id: Application ID
+
+        Returns:
+            List of attribute objects
+        """
+        try:
+            response = self.client.get(f'/api/v2/apps/{app_id}/attributes')
+            return response.get('data', response) if isinstance(response, dict) else response
+        except Exception as e:
+            logger.warning(f"Failed to get attributes for {app_id}: {e}")
+            return []
+
+    def _run_concurrently(self, calls: List[Callable[[], Any]]) -> List[Any]:
+        """
+        Run independent API calls on a thread pool.
+
+        Args:
+            calls: Zero-argument callables
+
+        Returns:
+            Results in the same order as calls; the first failure is re-raised
+        """
+        if len(calls) <= 1:
+            return [call() for call in calls]
+
+        with ThreadPoolExecutor(max_workers=min(self.ATTRIBUTE_WORKERS, len(calls))) as executor:
+            futures = [executor.submit(call) for call in calls]
+            return [future.result() for future in futures]
+
     def _build_protected_resources(
         self,
         resources: List[Dict[str, Any]]
@@ -497,17 +776,11 @@ class OAGApplicationManager:
             }
 
             # Health check configuration
-            if resource.get('health_check'):
-                hc = resource['health_check']
+            hc = resource.get('health_check')
+            if hc:
                 entry['healthCheck'] = {
-                    'enabled': True,
-                    'path': hc.get('path', '/health'),
-                    'method': hc.get('method', 'GET'),
-                    'expectedStatus': hc.get('expected_status', 200),
-                    'interval': hc.get('interval', 10),
-                    'timeout': hc.get('timeout', 1),
-                    'unhealthyThreshold': hc.get('unhealthy_threshold', 3),
-                    'healthyThreshold': hc.get('healthy_threshold', 2)
+                    **_HC_DEFAULTS,
+                    **{_HC_KEYS[key]: value for key, value in hc.items() if key in _HC_KEYS}
                 }
 
             result.append(entry)
@@ -529,16 +802,4 @@ class OAGApplicationManager:
         Returns:
             True if update needed
         """
-        # Map desired keys to API keys
-        mappings = {
-            'source': 'dataSource',
-            'field': 'field',
-            'type': 'targetType',
-            'name': 'name'
-        }
-
-        for desired_key, api_key in mappings.items():
-            if desired.get(desired_key) != current.get(api_key):
-                return True
-
-        return False
+        return _canon_config_attr(desired) != _canon_api_attr(current)
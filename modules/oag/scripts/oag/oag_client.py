@@ -8,18 +8,48 @@ Requires OAG version 2025.10.0 or later.
 import os
 import time
 import json
+import functools
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List
-from urllib.parse import urljoin
+from urllib.parse import quote_plus, urlencode, urljoin
 
 import requests
 import jwt
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional - falls back to the json module
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=256)
+def _join_url(base_url: str, endpoint: str) -> str:
+    """Resolve an endpoint against the base URL; repeated endpoints hit the cache."""
+    return urljoin(base_url, endpoint)
+
+
+def _json_dumps(data: Any) -> bytes:
+    """Encode a request body as UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def _json_loads(content: bytes) -> Any:
+    """Decode a JSON response body."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
 class OAGClient:
     """
     Client for Okta Access Gateway API with JWT authentication.
@@ -44,6 +74,21 @@ class OAGClient:
         'idp_read': 'okta.oag.idp.read',
     }
 
+    # JWT signing algorithms; ES256 needs a P-256 EC key and signs much faster than RS256
+    ALGORITHMS = ('RS256', 'ES256')
+
+    # Concurrency of OAGApplicationManager.deploy_applications: applications
+    # deployed at once, and attribute requests each of them runs in parallel
+    DEPLOY_WORKERS = 10
+    ATTRIBUTE_WORKERS = 8
+
+    # Connections kept open to the gateway; one per request a bulk deploy can
+    # have in flight, so none is discarded because the pool is full
+    POOL_SIZE = DEPLOY_WORKERS * ATTRIBUTE_WORKERS
+
+    # Retries for throttled or failing responses on idempotent requests
+    MAX_RETRIES = 5
+
     def __init__(
         self,
         hostname: str,
@@ -51,7 +96,9 @@ class OAGClient:
         private_key_path: Optional[str] = None,
         private_key: Optional[str] = None,
         scopes: Optional[List[str]] = None,
-        verify_ssl: bool = True
+        verify_ssl: bool = True,
+        algorithm: str = 'RS256',
+        token_cache_path: Optional[str] = None
     ):
         """
         Initialize OAG API client.
@@ -63,26 +110,26 @@ class OAGClient:
             private_key: Private key PEM string (alternative to path)
             scopes: List of scopes to request (defaults to all)
             verify_ssl: Verify SSL certificates (disable for self-signed)
+            algorithm: JWT signing algorithm, RS256 (RSA key) or ES256 (P-256 EC key)
+            token_cache_path: File to share the access token between runs (mode 0600)
         """
         self.hostname = hostname.rstrip('/')
         self.base_url = f"https://{self.hostname}"
+        self._token_url = f"{self.base_url}/api/v2/oauth/token"
         self.client_id = client_id
         self.verify_ssl = verify_ssl
 
-        # Load private key
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm: {algorithm} (expected one of {', '.join(self.ALGORITHMS)})")
+        self._algorithm = algorithm
+
+        # Private key source; parsed on first signature (see _private_key)
         if private_key_path:
-            with open(os.path.expanduser(private_key_path), 'rb') as f:
-                self._private_key = serialization.load_pem_private_key(
-                    f.read(),
-                    password=None,
-                    backend=default_backend()
-                )
+            self._private_key_path = os.path.expanduser(private_key_path)
+            self._private_key_pem = None
         elif private_key:
-            self._private_key = serialization.load_pem_private_key(
-                private_key.encode() if isinstance(private_key, str) else private_key,
-                password=None,
-                backend=default_backend()
-            )
+            self._private_key_path = None
+            self._private_key_pem = private_key.encode() if isinstance(private_key, str) else private_key
         else:
             raise ValueError("Either private_key_path or private_key must be provided")
 
@@ -92,41 +139,108 @@ class OAGClient:
         else:
             # Default to all scopes
             self.scopes = list(self.SCOPES.values())
+        self._scope_str = ' '.join(self.scopes)
+
+        # Claims that are the same in every client assertion
+        self._jwt_claims = {
+            'iss': self.client_id,
+            'sub': self.client_id,
+            'aud': self.base_url,
+            'scope': self._scope_str
+        }
+
+        # Token request form fields that never change; only the assertion is appended
+        self._token_form_prefix = urlencode({
+            'grant_type': 'client_credentials',
+            'client_assertion_type': 'urn:ietf:params:oauth:client-assertion-type:jwt-bearer',
+            'scope': self._scope_str
+        })
 
         # Token management
         self._access_token = None
-        self._token_expiry = 0
+        self._token_expiry = 0  # time.monotonic() deadline, immune to clock changes
+        self._token_lock = threading.Lock()
+
+        # Signed client assertion, reused until shortly before it expires
+        self._jwt = None
+        self._jwt_expiry = 0
 
         # Session for connection pooling
         self._session = requests.Session()
+        retry = Retry(
+            total=self.MAX_RETRIES,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False
+        )
+        self._session.mount('https://', HTTPAdapter(
+            pool_maxsize=self.POOL_SIZE,
+            max_retries=retry
+        ))
+
+        # Headers sent with every API call; Authorization is added per token
+        self._session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        })
+
+        # Reuse a still-valid token saved by an earlier process
+        self._token_cache_path = os.path.expanduser(token_cache_path) if token_cache_path else None
+        self._token_cache_key = f"{self.base_url} {self.client_id} {self._scope_str}"
+        if self._token_cache_path:
+            self._load_cached_token()
+
+    @functools.cached_property
+    def _private_key(self):
+        """
+        Private key used to sign client assertions.
+
+        Loaded lazily: a run that reuses a cached access token never signs,
+        so it skips reading and validating the key entirely.
+        """
+        pem = self._private_key_pem
+        if pem is None:
+            with open(self._private_key_path, 'rb') as f:
+                pem = f.read()
+        return serialization.load_pem_private_key(
+            pem,
+            password=None,
+            backend=default_backend()
+        )
 
     def _generate_jwt(self) -> str:
         """
         Generate a signed JWT for client credentials authentication.
 
+        The signed token is reused while it has more than 30 seconds left,
+        so a forced refresh (e.g. after a 401) does not pay for another
+        signature. The key is passed to PyJWT as the already-loaded
+        key object, so it is not re-parsed per signature.
+
         Returns:
             Signed JWT string
         """
         now = int(time.time())
+        if self._jwt and now < self._jwt_expiry - 30:
+            return self._jwt
 
         # JWT payload
         payload = {
-            'iss': self.client_id,
-            'sub': self.client_id,
-            'aud': self.base_url,
+            **self._jwt_claims,
             'exp': now + 300,  # 5 minutes
-            'iat': now,
-            'scope': ' '.join(self.scopes)
+            'iat': now
         }
 
-        # Sign with RS256
+        # Sign with the configured algorithm (RS256 by default)
         token = jwt.encode(
             payload,
             self._private_key,
-            algorithm='RS256',
-            headers={'typ': 'JWT', 'alg': 'RS256'}
+            algorithm=self._algorithm,
+            headers={'typ': 'JWT', 'alg': self._algorithm}
         )
 
+        self._jwt = token
+        self._jwt_expiry = payload['exp']
         return token
 
     def _get_access_token(self, force_refresh: bool = False) -> str:
@@ -139,49 +253,118 @@ class OAGClient:
         Returns:
             Access token string
         """
-        # Check if current token is still valid
-        if not force_refresh and self._access_token and time.time() < self._token_expiry - 60:
+        # Fast path: no lock while the current token is still valid
+        if not force_refresh and self._has_valid_token():
             return self._access_token
 
+        stale_token = self._access_token
+        with self._token_lock:
+            # Another thread may have refreshed while this one waited
+            if self._has_valid_token() and (not force_refresh or self._access_token != stale_token):
+                return self._access_token
+            return self._refresh_access_token()
+
+    def _has_valid_token(self) -> bool:
+        """Whether the current access token has more than a minute left."""
+        return bool(self._access_token) and time.monotonic() < self._token_expiry - 60
+
+    def _refresh_access_token(self) -> str:
+        """
+        Request a new access token; called with _token_lock held.
+
+        Returns:
+            Access token string
+        """
         logger.debug("Requesting new access token")
 
         # Generate signed JWT
         client_assertion = self._generate_jwt()
 
         # Request access token
-        token_url = f"{self.base_url}/api/v2/oauth/token"
-
-        data = {
-            'grant_type': 'client_credentials',
-            'client_assertion_type': 'urn:ietf:params:oauth:client-assertion-type:jwt-bearer',
-            'client_assertion': client_assertion,
-            'scope': ' '.join(self.scopes)
-        }
+        data = f"{self._token_form_prefix}&client_assertion={quote_plus(client_assertion)}"
 
+        # None drops the session's (possibly stale) bearer token from this request
         response = self._session.post(
-            token_url,
+            self._token_url,
             data=data,
-            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+            headers={
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Authorization': None
+            },
             verify=self.verify_ssl
         )
 
         if response.status_code != 200:
-            logger.error(f"Token request failed: {response.status_code} - {response.text}")
-            raise OAGAuthenticationError(
-                f"Failed to obtain access token: {response.status_code} - {response.text}"
-            )
+            # response.text decodes the body on every access, so read it once
+            detail = f"{response.status_code} - {response.text}"
+            logger.error(f"Token request failed: {detail}")
+            raise OAGAuthenticationError(f"Failed to obtain access token: {detail}")
 
-        token_data = response.json()
-        self._access_token = token_data.get('access_token')
+        token_data = _json_loads(response.content)
+        access_token = token_data.get('access_token')
+
+        # Set the header before publishing the token, so any caller that sees
+        # a valid token also sends it
+        self._session.headers['Authorization'] = f'Bearer {access_token}'
+        self._access_token = access_token
 
         # Calculate expiry (default to 1 hour if not specified)
         expires_in = token_data.get('expires_in', 3600)
-        self._token_expiry = time.time() + expires_in
+        self._token_expiry = time.monotonic() + expires_in
+
+        logger.debug("Obtained access token, expires in %ss", expires_in)
 
-        logger.debug(f"Obtained access token, expires in {expires_in}s")
+        if self._token_cache_path:
+            self._save_cached_token(expires_in)
 
         return self._access_token
 
+    def _load_cached_token(self) -> None:
+        """Adopt the token in the cache file if it is for this client and still valid."""
+        try:
+            with open(self._token_cache_path, 'rb') as f:
+                cached = _json_loads(f.read())
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(cached, dict) or cached.get('key') != self._token_cache_key:
+            return
+
+        expires_at = cached.get('expires_at')
+        access_token = cached.get('access_token')
+        if (not isinstance(expires_at, (int, float)) or isinstance(expires_at, bool)
+                or not isinstance(access_token, str) or not access_token):
+            return
+
+        # Stored as wall-clock time so it survives across processes
+        remaining = expires_at - time.time()
+        if remaining <= 60:
+            return
+
+        self._session.headers['Authorization'] = f"Bearer {access_token}"
+        self._access_token = access_token
+        self._token_expiry = time.monotonic() + remaining
+        logger.debug("Using cached access token from %s", self._token_cache_path)
+
+    def _save_cached_token(self, expires_in: float) -> None:
+        """Atomically write the current token to the cache file, readable only by the owner."""
+        cached = {
+            'key': self._token_cache_key,
+            'access_token': self._access_token,
+            'expires_at': time.time() + expires_in
+        }
+        tmp_path = f"{self._token_cache_path}.{os.getpid()}.tmp"
+        try:
+            cache_dir = os.path.dirname(self._token_cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_json_dumps(cached))
+            os.replace(tmp_path, self._token_cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write token cache {self._token_cache_path}: {e}")
+
     def _request(
         self,
         method: str,
@@ -203,29 +386,29 @@ class OAGClient:
         Returns:
             Response object
         """
-        url = urljoin(self.base_url, endpoint)
-        token = self._get_access_token()
-
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
+        url = _join_url(self.base_url, endpoint)
+        body = _json_dumps(data) if data is not None else None
+
+        # Refreshes the session's Authorization header when needed
+        self._get_access_token()
+
+        # On 401, refresh the token once and resend
+        attempts = 2 if retry_on_401 else 1
+        for attempt in range(attempts):
+            # Content-Type: application/json is already set on the session
+            response = self._session.request(
+                method=method,
+                url=url,
+                data=body,
+                params=params,
+                verify=self.verify_ssl
+            )
 
-        response = self._session.request(
-            method=method,
-            url=url,
-            headers=headers,
-            json=data,
-            params=params,
-            verify=self.verify_ssl
-        )
+            if response.status_code != 401 or attempt == attempts - 1:
+                break
 
-        # Handle token expiration
-        if response.status_code == 401 and retry_on_401:
             logger.debug("Token expired, refreshing and retrying")
             self._get_access_token(force_refresh=True)
-            return self._request(method, endpoint, data, params, retry_on_401=False)
 
         return response
 
@@ -242,7 +425,27 @@ class OAGClient:
         """
         response = self._request('GET', endpoint, params=params)
         response.raise_for_status()
-        return response.json() if response.text else {}
+        return _json_loads(response.content) if response.content else {}
+
+    def get_many(self, endpoints: List[str], max_workers: int = 16) -> List[Dict[str, Any]]:
+        """
+        Make several GET requests concurrently over the pooled session.
+
+        Args:
+            endpoints: API endpoints
+            max_workers: Maximum requests in flight at once
+
+        Returns:
+            JSON response data, in the same order as endpoints
+        """
+        if len(endpoints) <= 1:
+            return [self.get(endpoint) for endpoint in endpoints]
+
+        # Obtain a token up front so the workers don't all request one
+        self._get_access_token()
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(endpoints))) as executor:
+            return list(executor.map(self.get, endpoints))
 
     def post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -257,7 +460,7 @@ class OAGClient:
         """
         response = self._request('POST', endpoint, data=data)
         response.raise_for_status()
-        return response.json() if response.text else {}
+        return _json_loads(response.content) if response.content else {}
 
     def put(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -272,7 +475,7 @@ class OAGClient:
         """
         response = self._request('PUT', endpoint, data=data)
         response.raise_for_status()
-        return response.json() if response.text else {}
+        return _json_loads(response.content) if response.content else {}
 
     def delete(self, endpoint: str) -> bool:
         """
@@ -295,14 +498,20 @@ class OAGClient:
         Returns:
             Health status information
         """
+        healthy = {
+            'status': 'healthy',
+            'hostname': self.hostname,
+            'authenticated': True
+        }
+
+        # A valid cached token already proves authentication
+        if self._has_valid_token():
+            return healthy
+
         try:
             # Try to get token to verify authentication
             self._get_access_token()
-            return {
-                'status': 'healthy',
-                'hostname': self.hostname,
-                'authenticated': True
-            }
+            return healthy
         except Exception as e:
             return {
                 'status': 'unhealthy',
@@ -328,7 +537,9 @@ class OAGClient:
             private_key_path=config.get('private_key_path'),
             private_key=config.get('private_key'),
             scopes=config.get('scopes'),
-            verify_ssl=config.get('verify_ssl', True)
+            verify_ssl=config.get('verify_ssl', True),
+            algorithm=config.get('algorithm', 'RS256'),
+            token_cache_path=config.get('token_cache_path')
         )
 
     @classmethod
@@ -342,6 +553,8 @@ class OAGClient:
             OAG_PRIVATE_KEY_PATH: Path to private key
             OAG_PRIVATE_KEY: Private key content (alternative)
             OAG_VERIFY_SSL: Verify SSL (default: true)
+            OAG_JWT_ALGORITHM: JWT signing algorithm (default: RS256)
+            OAG_TOKEN_CACHE: File to share the access token between runs (optional)
 
         Returns:
             OAGClient instance
@@ -351,6 +564,8 @@ class OAGClient:
         private_key_path = os.environ.get('OAG_PRIVATE_KEY_PATH')
         private_key = os.environ.get('OAG_PRIVATE_KEY')
         verify_ssl = os.environ.get('OAG_VERIFY_SSL', 'true').lower() == 'true'
+        algorithm = os.environ.get('OAG_JWT_ALGORITHM', 'RS256')
+        token_cache_path = os.environ.get('OAG_TOKEN_CACHE')
 
         if not hostname:
             raise ValueError("OAG_HOSTNAME environment variable is required")
@@ -364,7 +579,9 @@ class OAGClient:
             client_id=client_id,
             private_key_path=private_key_path,
             private_key=private_key,
-            verify_ssl=verify_ssl
+            verify_ssl=verify_ssl,
+            algorithm=algorithm,
+            token_cache_path=token_cache_path
         )
 
 
@@ -19,15 +19,106 @@ Environment variables required:
 """
 
 import argparse
+import functools
+import io
 import json
 import os
 import sys
 import requests
-from typing import List, Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Iterator, Optional, Tuple
 from datetime import datetime
 import re
 import base64
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional - falls back to the json module for the export file
+
+
+# =============================================================================
+# Terraform templates
+# =============================================================================
+# String values are passed through _hcl_string(), which adds the quotes.
+
+_RESOURCE_GROUP_TEMPLATE = '''
+resource "oktapam_resource_group" "{tf_name}" {{
+  name        = {name}
+  description = {description}
+}}
+'''
+
+_PROJECT_TEMPLATE = '''
+resource "oktapam_resource_group_project" "{tf_name}" {{
+  name                 = {name}
+  resource_group       = {rg_ref}
+  ssh_certificate_type = {ssh_cert_type}
+  account_discovery    = {account_discovery}
+  create_server_users  = {create_server_users}
+  forward_traffic      = {forward_traffic}
+}}
+'''
+
+_GROUP_TEMPLATE = '''
+resource "oktapam_group" "{tf_name}" {{
+  name = {name}
+}}
+'''
+
+_GATEWAY_TOKEN_TEMPLATE = '''
+resource "oktapam_gateway_setup_token" "{tf_name}" {{
+  description = {description}{labels}
+}}
+'''
+
+_SECRET_FOLDER_TEMPLATE = '''
+resource "oktapam_secret_folder" "{tf_name}" {{
+  name           = {name}
+  description    = {description}
+  resource_group = oktapam_resource_group.{rg_tf_name}.id
+  project        = oktapam_resource_group_project.{project_tf_name}.id
+}}
+'''
+
+
+def _section_header(title: str) -> str:
+    """Comment banner that introduces a section of the generated Terraform."""
+    rule = "# " + "-" * 77
+    return f"\n{rule}\n# {title}\n{rule}"
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """Write pre-encoded bytes to path, bypassing the text I/O layers."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+# Matches each escape pair in json.dumps output, so an escaped backslash
+# followed by "b" is never mistaken for a \b escape
+_JSON_ESCAPE = re.compile(r'\\(.)')
+_HCL_ESCAPES = {'b': '\\u0008', 'f': '\\u000c'}
+
+
+def _hcl_string(value) -> str:
+    """Render a value as a quoted HCL string literal.
+
+    json.dumps handles quotes, backslashes and control characters; HCL
+    additionally treats ${ and %{ as template sequences, so those are escaped.
+    HCL has no \\b or \\f escapes, so those are rewritten as \\u0008 and \\u000c.
+    """
+    quoted = json.dumps("" if value is None else str(value), ensure_ascii=False)
+    quoted = _JSON_ESCAPE.sub(lambda m: _HCL_ESCAPES.get(m.group(1), m.group(0)), quoted)
+    return quoted.replace("${", "$${").replace("%{", "%%{")
 
 
 class OPAImporter:
@@ -36,42 +127,55 @@ class OPAImporter:
     # OPA API base URL
     API_BASE = "https://app.scaleft.com/v1"
 
+    # Keep-alive connections held open to the OPA API host
+    POOL_SIZE = 16
+
+    # Concurrent requests when fetching per-resource-group/per-project data
+    MAX_WORKERS = 8
+
     def __init__(self, team: str, key: str, secret: str):
         self.team = team
         self.key = key
         self.secret = secret
         self.token = None
         self.token_expiry = 0
+        self._token_lock = threading.Lock()
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE)
+        self.session.mount("https://", adapter)
 
     def _get_token(self) -> str:
         """Get or refresh bearer token for OPA API"""
-        current_time = time.time()
-
         # Return cached token if still valid (with 60 second buffer)
-        if self.token and current_time < (self.token_expiry - 60):
+        if self.token and time.time() < (self.token_expiry - 60):
             return self.token
 
-        # Request new token
-        auth_url = f"{self.API_BASE}/teams/{self.team}/service_token"
-        auth_data = {
-            "key_id": self.key,
-            "key_secret": self.secret
-        }
+        with self._token_lock:
+            # Another thread may have refreshed the token while we waited
+            current_time = time.time()
+            if self.token and current_time < (self.token_expiry - 60):
+                return self.token
+
+            # Request new token
+            auth_url = f"{self.API_BASE}/teams/{self.team}/service_token"
+            auth_data = {
+                "key_id": self.key,
+                "key_secret": self.secret
+            }
 
-        try:
-            response = requests.post(auth_url, json=auth_data)
-            response.raise_for_status()
-            token_data = response.json()
-            self.token = token_data.get("bearer_token")
-            # Token is typically valid for 1 hour
-            self.token_expiry = current_time + 3600
-            return self.token
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Failed to authenticate with OPA: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"   Response: {e.response.text}")
-            sys.exit(1)
+            try:
+                response = self.session.post(auth_url, json=auth_data)
+                response.raise_for_status()
+                token_data = response.json()
+                self.token = token_data.get("bearer_token")
+                # Token is typically valid for 1 hour
+                self.token_expiry = current_time + 3600
+                return self.token
+            except requests.exceptions.RequestException as e:
+                print(f"❌ Failed to authenticate with OPA: {e}")
+                if hasattr(e, 'response') and e.response is not None:
+                    print(f"   Response: {e.response.text}")
+                sys.exit(1)
 
     def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
         """Make authenticated API request to OPA"""
@@ -82,7 +186,10 @@ class OPAImporter:
             "Accept": "application/json"
         }
 
-        url = f"{self.API_BASE}/teams/{self.team}{endpoint}"
+        if endpoint.startswith("https://"):
+            url = endpoint  # Absolute pagination link
+        else:
+            url = f"{self.API_BASE}/teams/{self.team}{endpoint}"
 
         try:
             response = self.session.request(method, url, headers=headers, **kwargs)
@@ -95,7 +202,22 @@ class OPAImporter:
                 print(f"   Response: {e.response.text[:500]}")
             raise
 
-    def _sanitize_name(self, name: str) -> str:
+    def _iter_list(self, endpoint: str, params: Optional[Dict] = None) -> Iterator[Dict]:
+        """Yield every item from a paginated OPA list endpoint.
+
+        Follows the next-page link from either the Link header or a "next"
+        field in the response body until no further page is returned.
+        """
+        while endpoint:
+            response = self._make_request("GET", endpoint, params=params)
+            body = response.json()
+            yield from body.get("list", [])
+            endpoint = response.links.get("next", {}).get("url") or body.get("next")
+            params = None  # The next link already carries the query string
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _sanitize_name(name: str) -> str:
         """Convert name to valid Terraform resource name"""
         sanitized = re.sub(r'[^a-zA-Z0-9_]', '_', name.lower())
         sanitized = re.sub(r'_+', '_', sanitized)
@@ -112,8 +234,7 @@ class OPAImporter:
         """Fetch all resource groups"""
         print("Fetching resource groups...")
         try:
-            response = self._make_request("GET", "/resource_groups")
-            groups = response.json().get("list", [])
+            groups = list(self._iter_list("/resource_groups"))
             print(f"  Found {len(groups)} resource groups")
             return groups
         except Exception as e:
@@ -128,8 +249,7 @@ class OPAImporter:
                 endpoint = f"/resource_groups/{resource_group_id}/projects"
             else:
                 endpoint = "/projects"
-            response = self._make_request("GET", endpoint)
-            projects = response.json().get("list", [])
+            projects = list(self._iter_list(endpoint))
             print(f"  Found {len(projects)} projects")
             return projects
         except Exception as e:
@@ -140,8 +260,7 @@ class OPAImporter:
         """Fetch all OPA groups"""
         print("Fetching groups...")
         try:
-            response = self._make_request("GET", "/groups")
-            groups = response.json().get("list", [])
+            groups = list(self._iter_list("/groups"))
             print(f"  Found {len(groups)} groups")
             return groups
         except Exception as e:
@@ -151,8 +270,7 @@ class OPAImporter:
     def fetch_server_enrollment_tokens(self, project_name: str) -> List[Dict]:
         """Fetch server enrollment tokens for a project"""
         try:
-            response = self._make_request("GET", f"/projects/{project_name}/server_enrollment_tokens")
-            tokens = response.json().get("list", [])
+            tokens = list(self._iter_list(f"/projects/{project_name}/server_enrollment_tokens"))
             return tokens
         except Exception as e:
             print(f"  ⚠️  Could not fetch enrollment tokens for {project_name}: {e}")
@@ -162,8 +280,7 @@ class OPAImporter:
         """Fetch gateway setup tokens"""
         print("Fetching gateway setup tokens...")
         try:
-            response = self._make_request("GET", "/gateway_setup_tokens")
-            tokens = response.json().get("list", [])
+            tokens = list(self._iter_list("/gateway_setup_tokens"))
             print(f"  Found {len(tokens)} gateway setup tokens")
             return tokens
         except Exception as e:
@@ -174,8 +291,7 @@ class OPAImporter:
         """Fetch secret folders for a project"""
         try:
             endpoint = f"/resource_groups/{resource_group_id}/projects/{project_id}/secret_folders"
-            response = self._make_request("GET", endpoint)
-            folders = response.json().get("list", [])
+            folders = list(self._iter_list(endpoint))
             return folders
         except Exception as e:
             return []
@@ -184,8 +300,7 @@ class OPAImporter:
         """Fetch security policies"""
         print("Fetching security policies...")
         try:
-            response = self._make_request("GET", "/security_policies")
-            policies = response.json().get("list", [])
+            policies = list(self._iter_list("/security_policies"))
             print(f"  Found {len(policies)} security policies")
             return policies
         except Exception as e:
@@ -203,12 +318,11 @@ class OPAImporter:
         rg_id = rg.get("id", "")
         description = rg.get("description", "")
 
-        tf_code = f'''
-resource "oktapam_resource_group" "{tf_name}" {{
-  name        = "{name}"
-  description = "{description}"
-}}
-'''
+        tf_code = _RESOURCE_GROUP_TEMPLATE.format(
+            tf_name=tf_name,
+            name=_hcl_string(name),
+            description=_hcl_string(description),
+        )
         import_cmd = f"terraform import oktapam_resource_group.{tf_name} {rg_id}"
         return tf_code, import_cmd
 
@@ -223,23 +337,17 @@ resource "oktapam_resource_group" "{tf_name}" {{
         if resource_group_tf_name:
             rg_ref = f"oktapam_resource_group.{resource_group_tf_name}.id"
         else:
-            rg_ref = f'"{rg_id}"'
-
-        ssh_cert_type = project.get("ssh_certificate_type", "CERT_TYPE_ED25519")
-        account_discovery = str(project.get("account_discovery", True)).lower()
-        create_server_users = str(project.get("create_server_users", True)).lower()
-        forward_traffic = str(project.get("forward_traffic", False)).lower()
-
-        tf_code = f'''
-resource "oktapam_resource_group_project" "{tf_name}" {{
-  name                 = "{name}"
-  resource_group       = {rg_ref}
-  ssh_certificate_type = "{ssh_cert_type}"
-  account_discovery    = {account_discovery}
-  create_server_users  = {create_server_users}
-  forward_traffic      = {forward_traffic}
-}}
-'''
+            rg_ref = _hcl_string(rg_id)
+
+        tf_code = _PROJECT_TEMPLATE.format(
+            tf_name=tf_name,
+            name=_hcl_string(name),
+            rg_ref=rg_ref,
+            ssh_cert_type=_hcl_string(project.get("ssh_certificate_type", "CERT_TYPE_ED25519")),
+            account_discovery=str(project.get("account_discovery", True)).lower(),
+            create_server_users=str(project.get("create_server_users", True)).lower(),
+            forward_traffic=str(project.get("forward_traffic", False)).lower(),
+        )
         import_cmd = f"terraform import oktapam_resource_group_project.{tf_name} {rg_id}/{project_id}"
         return tf_code, import_cmd
 
@@ -249,11 +357,7 @@ resource "oktapam_resource_group_project" "{tf_name}" {{
         tf_name = self._sanitize_name(name)
         group_id = group.get("id", "")
 
-        tf_code = f'''
-resource "oktapam_group" "{tf_name}" {{
-  name = "{name}"
-}}
-'''
+        tf_code = _GROUP_TEMPLATE.format(tf_name=tf_name, name=_hcl_string(name))
         import_cmd = f"terraform import oktapam_group.{tf_name} {group_id}"
         return tf_code, import_cmd
 
@@ -266,17 +370,16 @@ resource "oktapam_group" "{tf_name}" {{
 
         labels_str = ""
         if labels:
-            labels_items = [f'    {k} = "{v}"' for k, v in labels.items()]
-            labels_str = f'''
-  labels = {{
-{chr(10).join(labels_items)}
-  }}'''
-
-        tf_code = f'''
-resource "oktapam_gateway_setup_token" "{tf_name}" {{
-  description = "{description}"{labels_str}
-}}
-'''
+            labels_items = "\n".join(
+                f"    {_hcl_string(k)} = {_hcl_string(v)}" for k, v in labels.items()
+            )
+            labels_str = f"\n  labels = {{\n{labels_items}\n  }}"
+
+        tf_code = _GATEWAY_TOKEN_TEMPLATE.format(
+            tf_name=tf_name,
+            description=_hcl_string(description),
+            labels=labels_str,
+        )
         import_cmd = f"terraform import oktapam_gateway_setup_token.{tf_name} {token_id}"
         return tf_code, import_cmd
 
@@ -287,14 +390,13 @@ resource "oktapam_gateway_setup_token" "{tf_name}" {{
         folder_id = folder.get("id", "")
         description = folder.get("description", "")
 
-        tf_code = f'''
-resource "oktapam_secret_folder" "{tf_name}" {{
-  name           = "{name}"
-  description    = "{description}"
-  resource_group = oktapam_resource_group.{rg_tf_name}.id
-  project        = oktapam_resource_group_project.{project_tf_name}.id
-}}
-'''
+        tf_code = _SECRET_FOLDER_TEMPLATE.format(
+            tf_name=tf_name,
+            name=_hcl_string(name),
+            description=_hcl_string(description),
+            rg_tf_name=rg_tf_name,
+            project_tf_name=project_tf_name,
+        )
         import_cmd = f"terraform import oktapam_secret_folder.{tf_name} {folder_id}"
         return tf_code, import_cmd
 
@@ -316,11 +418,18 @@ resource "oktapam_secret_folder" "{tf_name}" {{
         if not dry_run:
             os.makedirs(output_dir, exist_ok=True)
 
-        tf_code_blocks = []
+        tf_out = io.StringIO()
+
+        def emit(block: str) -> None:
+            """Append a block to the Terraform output, newline-separated."""
+            if tf_out.tell():
+                tf_out.write("\n")
+            tf_out.write(block)
+
         import_commands = []
 
         # Header
-        tf_code_blocks.append(f'''# =============================================================================
+        emit(f'''# =============================================================================
 # OPA RESOURCES - Auto-imported from Okta Privileged Access
 # =============================================================================
 # Generated: {datetime.now().isoformat()}
@@ -335,27 +444,25 @@ resource "oktapam_secret_folder" "{tf_name}" {{
         resource_groups = self.fetch_resource_groups()
         rg_map = {}  # Map RG ID to TF name
         if resource_groups:
-            tf_code_blocks.append("\n# -----------------------------------------------------------------------------")
-            tf_code_blocks.append("# Resource Groups")
-            tf_code_blocks.append("# -----------------------------------------------------------------------------")
+            emit(_section_header("Resource Groups"))
             for rg in resource_groups:
                 tf_code, import_cmd = self.generate_resource_group_tf(rg)
-                tf_code_blocks.append(tf_code)
+                emit(tf_code)
                 import_commands.append(import_cmd)
                 rg_map[rg.get("id")] = self._sanitize_name(rg.get("name", ""))
 
         # Projects (for each resource group)
         all_projects = []
         project_map = {}  # Map project ID to (TF name, RG TF name)
-        for rg in resource_groups:
-            rg_id = rg.get("id")
-            rg_tf_name = rg_map.get(rg_id, "")
-            projects = self.fetch_projects(rg_id)
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            rg_projects = list(executor.map(lambda rg: self.fetch_projects(rg.get("id")), resource_groups))
+        for rg, projects in zip(resource_groups, rg_projects):
+            rg_tf_name = rg_map.get(rg.get("id"), "")
             if projects:
-                tf_code_blocks.append(f"\n# Projects in {rg.get('name', 'Unknown')}")
+                emit(f"\n# Projects in {rg.get('name', 'Unknown')}")
                 for project in projects:
                     tf_code, import_cmd = self.generate_project_tf(project, rg_tf_name)
-                    tf_code_blocks.append(tf_code)
+                    emit(tf_code)
                     import_commands.append(import_cmd)
                     project_tf_name = self._sanitize_name(project.get("name", ""))
                     project_map[project.get("id")] = (project_tf_name, rg_tf_name)
@@ -364,43 +471,38 @@ resource "oktapam_secret_folder" "{tf_name}" {{
         # Groups
         groups = self.fetch_groups()
         if groups:
-            tf_code_blocks.append("\n# -----------------------------------------------------------------------------")
-            tf_code_blocks.append("# OPA Groups")
-            tf_code_blocks.append("# -----------------------------------------------------------------------------")
+            emit(_section_header("OPA Groups"))
             for group in groups:
                 tf_code, import_cmd = self.generate_group_tf(group)
-                tf_code_blocks.append(tf_code)
+                emit(tf_code)
                 import_commands.append(import_cmd)
 
         # Gateway Setup Tokens
         gateway_tokens = self.fetch_gateway_setup_tokens()
         if gateway_tokens:
-            tf_code_blocks.append("\n# -----------------------------------------------------------------------------")
-            tf_code_blocks.append("# Gateway Setup Tokens")
-            tf_code_blocks.append("# -----------------------------------------------------------------------------")
+            emit(_section_header("Gateway Setup Tokens"))
             for token in gateway_tokens:
                 tf_code, import_cmd = self.generate_gateway_token_tf(token)
-                tf_code_blocks.append(tf_code)
+                emit(tf_code)
                 import_commands.append(import_cmd)
 
         # Secret Folders (for each project)
         secret_folders_found = []
-        for project, rg_tf_name in all_projects:
-            rg_id = project.get("resource_group_id")
-            project_id = project.get("id")
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            project_folders = list(executor.map(
+                lambda item: self.fetch_secret_folders(item[0].get("resource_group_id"), item[0].get("id")),
+                all_projects
+            ))
+        for (project, rg_tf_name), folders in zip(all_projects, project_folders):
             project_tf_name = self._sanitize_name(project.get("name", ""))
-            folders = self.fetch_secret_folders(rg_id, project_id)
-            if folders:
-                for folder in folders:
-                    secret_folders_found.append((folder, rg_tf_name, project_tf_name))
+            for folder in folders:
+                secret_folders_found.append((folder, rg_tf_name, project_tf_name))
 
         if secret_folders_found:
-            tf_code_blocks.append("\n# -----------------------------------------------------------------------------")
-            tf_code_blocks.append("# Secret Folders")
-            tf_code_blocks.append("# -----------------------------------------------------------------------------")
+            emit(_section_header("Secret Folders"))
             for folder, rg_tf_name, project_tf_name in secret_folders_found:
                 tf_code, import_cmd = self.generate_secret_folder_tf(folder, rg_tf_name, project_tf_name)
-                tf_code_blocks.append(tf_code)
+                emit(tf_code)
                 import_commands.append(import_cmd)
 
         # Write output files
@@ -408,7 +510,7 @@ resource "oktapam_secret_folder" "{tf_name}" {{
             print("\n" + "=" * 60)
             print("DRY RUN - Generated Terraform Code:")
             print("=" * 60)
-            print("\n".join(tf_code_blocks))
+            print(tf_out.getvalue())
             print("\n" + "=" * 60)
             print("DRY RUN - Import Commands:")
             print("=" * 60)
@@ -417,19 +519,20 @@ resource "oktapam_secret_folder" "{tf_name}" {{
         else:
             # Write Terraform file
             tf_file = os.path.join(output_dir, "opa_resources_imported.tf")
-            with open(tf_file, "w") as f:
-                f.write("\n".join(tf_code_blocks))
+            _write_file(tf_file, tf_out.getvalue().encode("utf-8"))
             print(f"\n✅ Terraform code written to: {tf_file}")
 
             # Write import commands
             import_file = os.path.join(output_dir, "opa_import_commands.sh")
-            with open(import_file, "w") as f:
-                f.write("#!/bin/bash\n")
-                f.write("# OPA Resource Import Commands\n")
-                f.write(f"# Generated: {datetime.now().isoformat()}\n")
-                f.write("# Run these commands after terraform init\n\n")
-                for cmd in import_commands:
-                    f.write(cmd + "\n")
+            import_script = (
+                "#!/bin/bash\n"
+                "# OPA Resource Import Commands\n"
+                f"# Generated: {datetime.now().isoformat()}\n"
+                "# Run these commands after terraform init\n\n"
+            )
+            if import_commands:
+                import_script += "\n".join(import_commands) + "\n"
+            _write_file(import_file, import_script.encode("utf-8"))
             os.chmod(import_file, 0o755)
             print(f"✅ Import commands written to: {import_file}")
 
@@ -442,8 +545,11 @@ resource "oktapam_secret_folder" "{tf_name}" {{
                 "groups": groups,
                 "gateway_tokens": gateway_tokens,
             }
-            with open(json_file, "w") as f:
-                json.dump(export_data, f, indent=2)
+            if orjson is not None:
+                json_bytes = orjson.dumps(export_data, option=orjson.OPT_INDENT_2)
+            else:
+                json_bytes = json.dumps(export_data, indent=2).encode("utf-8")
+            _write_file(json_file, json_bytes)
             print(f"✅ JSON export written to: {json_file}")
 
         # Summary
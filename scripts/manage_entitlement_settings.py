@@ -30,6 +30,9 @@ Usage:
     # Disable entitlement management
     python scripts/manage_entitlement_settings.py --action disable --app-id 0oaXXXXX
 
+    # Bypass the app list cache (label lookups reuse it for 5 minutes)
+    python scripts/manage_entitlement_settings.py --action status --app-label "Salesforce*" --no-cache
+
 Environment Variables:
     OKTA_ORG_NAME   - Okta org name (e.g., dev-12345)
     OKTA_BASE_URL   - Okta base URL (e.g., okta.com)
@@ -45,9 +48,15 @@ import argparse
 import fnmatch
 import json
 import os
+import random
+import re
 import sys
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -72,14 +81,6 @@ except ImportError:
                 "Accept": "application/json"
             })
 
-        def _handle_rate_limit(self, response) -> None:
-            """Handle rate limiting by waiting if needed."""
-            if response.status_code == 429:
-                reset_time = int(response.headers.get('X-Rate-Limit-Reset', time.time() + 60))
-                wait_time = max(reset_time - time.time() + 1, 1)
-                print(f"  Rate limited. Waiting {wait_time:.0f}s...")
-                time.sleep(wait_time)
-
 
 class EntitlementSettingsManager:
     """Manages entitlement settings for Okta applications."""
@@ -96,56 +97,187 @@ class EntitlementSettingsManager:
         "okta-browser-plugin",
     ]
 
-    def __init__(self, org_name: str, base_url: str, api_token: str):
+    # Matches any SYSTEM_APPS entry as a substring of a lowercased label/name
+    _SYSTEM_APPS_RE = re.compile("|".join(re.escape(sys_app.lower()) for sys_app in SYSTEM_APPS))
+
+    # Sign-on modes that can never have entitlement management; their
+    # settings are reported as not_eligible without calling the API.
+    # Eligibility follows provisioning, and SWA (BROWSER_PLUGIN/AUTO_LOGIN)
+    # apps can have SCIM, so only bookmarks are listed here.
+    INELIGIBLE_SIGN_ON_MODES = frozenset({"BOOKMARK"})
+
+    # Concurrent requests used when checking many apps at once
+    MAX_WORKERS = 16
+
+    # Attempts per request when Okta responds 429 (rate limited)
+    MAX_RETRIES = 5
+
+    # How long (seconds) the on-disk app list cache is reused
+    APPS_CACHE_TTL = 300
+
+    # App fields kept in the cache (everything the actions read)
+    APPS_CACHE_FIELDS = ("id", "label", "name", "signOnMode", "status")
+
+    def __init__(self, org_name: str, base_url: str, api_token: str, use_cache: bool = True):
         self.api = OktaAPIManager(org_name, base_url, api_token)
         self.base_url = f"https://{org_name}.{base_url}"
         self.governance_url = f"{self.base_url}/governance/api/v1"
+        self.apps_cache_file = None
+        if use_cache:
+            # Keyed on the full host so e.g. okta.com and oktapreview.com
+            # orgs with the same name never share a cache file
+            self.apps_cache_file = os.path.join(
+                os.path.expanduser("~"), ".cache", f"okta_apps_{org_name}.{base_url}.json"
+            )
+
+        # One pooled connection per worker, plus one for the thread paging
+        # through apps. pool_block makes callers wait for a kept-alive
+        # connection instead of opening (and discarding) an extra one.
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.MAX_WORKERS + 1, pool_block=True
+        )
+        self.api.session.mount("https://", adapter)
+
+        # Monotonic time before which no request should be sent (after a 429)
+        self._rate_limit_resume_at = 0.0
+        self._rate_limit_lock = threading.Lock()
+
+    def _request(self, method: str, url: str, **kwargs):
+        """Make an API request, retrying when rate limited (429)."""
+        for attempt in range(self.MAX_RETRIES):
+            self._wait_for_rate_limit_reset()
+            response = self.api.session.request(method, url, **kwargs)
+            if response.status_code != 429:
+                return response
+            if attempt < self.MAX_RETRIES - 1:
+                self._pause_for_rate_limit(response, attempt)
+        return response
+
+    def _pause_for_rate_limit(self, response, attempt: int) -> None:
+        """
+        Pause all requests until the rate limit resets.
 
-    def get_all_apps(self) -> List[Dict]:
-        """Get all applications from Okta."""
+        Uses X-Rate-Limit-Reset when present, otherwise exponential backoff.
+        The pause is shared, so concurrent workers wait for the same reset
+        instead of each sleeping and retrying on its own schedule.
+        """
+        reset_time = float(response.headers.get('X-Rate-Limit-Reset') or 0)
+        if reset_time:
+            wait_time = max(reset_time - time.time() + 1, 1)
+        else:
+            wait_time = min(2 ** attempt, 60)
+
+        resume_at = time.monotonic() + wait_time
+        with self._rate_limit_lock:
+            if resume_at <= self._rate_limit_resume_at:
+                return  # Another worker already paused for at least this long
+            self._rate_limit_resume_at = resume_at
+        print(f"  Rate limited. Waiting {wait_time:.0f}s...")
+
+    def _wait_for_rate_limit_reset(self) -> None:
+        """Sleep until any active rate-limit pause has elapsed."""
+        remaining = self._rate_limit_resume_at - time.monotonic()
+        if remaining > 0:
+            # Jitter so paused workers don't all retry at the same instant
+            time.sleep(remaining + random.uniform(0, 1))
+
+    def iter_app_pages(self) -> Iterator[List[Dict]]:
+        """Yield applications from Okta one page at a time."""
         url = f"{self.base_url}/api/v1/apps"
         params = {"limit": 200}
-        apps = []
+        request = self._request
 
         while url:
-            response = self.api.session.get(url, params=params)
-            if response.status_code == 429:
-                self.api._handle_rate_limit(response)
-                continue
+            response = request("GET", url, params=params)
             response.raise_for_status()
-            apps.extend(response.json())
 
             # Handle pagination
-            url = None
-            params = {}
+            next_url = None
             if "next" in response.links:
-                url = response.links["next"]["url"]
+                next_url = response.links["next"]["url"]
+
+            yield response.json()
+
+            url = next_url
+            params = {}
+
+    def iter_all_apps(self) -> Iterator[Dict]:
+        """Yield every application from Okta, fetching pages as needed."""
+        for page in self.iter_app_pages():
+            yield from page
+
+    def get_all_apps(self) -> List[Dict]:
+        """
+        Get all applications from Okta.
 
+        Results are cached on disk for APPS_CACHE_TTL seconds so repeated
+        runs against the same org (e.g. several --app-label patterns) don't
+        page through every app again.
+        """
+        apps = self._load_apps_cache()
+        if apps is not None:
+            return apps
+
+        apps = list(self.iter_all_apps())
+        self._save_apps_cache(apps)
         return apps
 
+    def _load_apps_cache(self) -> Optional[List[Dict]]:
+        """Return cached apps if the cache file exists and is still fresh."""
+        if not self.apps_cache_file:
+            return None
+        try:
+            if time.time() - os.stat(self.apps_cache_file).st_mtime > self.APPS_CACHE_TTL:
+                return None
+            with open(self.apps_cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_apps_cache(self, apps: List[Dict]) -> None:
+        """Write apps to the cache file (best effort)."""
+        if not self.apps_cache_file:
+            return
+        cached = [
+            {field: app.get(field) for field in self.APPS_CACHE_FIELDS}
+            for app in apps
+        ]
+        tmp_file = f"{self.apps_cache_file}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.apps_cache_file), exist_ok=True)
+            with open(tmp_file, "w") as f:
+                json.dump(cached, f)
+            os.replace(tmp_file, self.apps_cache_file)
+        except OSError:
+            pass
+
     def get_app_by_id(self, app_id: str) -> Optional[Dict]:
-        """Get a specific application by ID."""
+        """Get a specific application by ID (from the app list cache when fresh)."""
+        for app in self._load_apps_cache() or []:
+            if app.get("id") == app_id:
+                return app
+
         url = f"{self.base_url}/api/v1/apps/{app_id}"
-        response = self.api.session.get(url)
+        response = self._request("GET", url)
         if response.status_code == 404:
             return None
         response.raise_for_status()
         return response.json()
 
-    def filter_apps_by_label(self, apps: List[Dict], pattern: str) -> List[Dict]:
+    def filter_apps_by_label(self, apps: Iterable[Dict], pattern: str) -> List[Dict]:
         """Filter apps by label pattern (supports wildcards)."""
+        match = re.compile(fnmatch.translate(pattern)).match
         return [
             app for app in apps
-            if fnmatch.fnmatch(app.get("label", ""), pattern)
+            if match(app.get("label") or "")
         ]
 
     def is_system_app(self, app: Dict) -> bool:
         """Check if an app is a system app that shouldn't be modified."""
-        label = app.get("label", "").lower()
-        name = app.get("name", "").lower()
-        return any(
-            sys_app.lower() in label or sys_app.lower() in name
-            for sys_app in self.SYSTEM_APPS
+        label = (app.get("label") or "").lower()
+        name = (app.get("name") or "").lower()
+        return bool(
+            self._SYSTEM_APPS_RE.search(label) or self._SYSTEM_APPS_RE.search(name)
         )
 
     def get_entitlement_settings(self, app_id: str) -> Optional[Dict]:
@@ -155,7 +287,7 @@ class EntitlementSettingsManager:
         Returns the entitlement management status and configuration.
         """
         url = f"{self.governance_url}/entitlement-settings/{app_id}"
-        response = self.api.session.get(url)
+        response = self._request("GET", url)
 
         if response.status_code == 404:
             # App doesn't have entitlement management enabled or not supported
@@ -163,9 +295,6 @@ class EntitlementSettingsManager:
         elif response.status_code == 400:
             # API might not be available or app not eligible
             return {"enabled": False, "status": "not_eligible", "error": response.text}
-        elif response.status_code == 429:
-            self.api._handle_rate_limit(response)
-            return self.get_entitlement_settings(app_id)
 
         if response.ok:
             data = response.json()
@@ -173,6 +302,73 @@ class EntitlementSettingsManager:
 
         return {"enabled": False, "status": "error", "error": response.text}
 
+    def ineligible_settings(self, app: Dict) -> Optional[Dict]:
+        """
+        Return a not_eligible result for apps whose sign-on mode can never
+        support entitlement management, so no API call is spent on them.
+        """
+        sign_on_mode = app.get("signOnMode")
+        if sign_on_mode in self.INELIGIBLE_SIGN_ON_MODES:
+            return {
+                "enabled": False,
+                "status": "not_eligible",
+                "reason": f"signOnMode {sign_on_mode} does not support entitlement management"
+            }
+        return None
+
+    def get_entitlement_settings_bulk(self, apps: List[Dict]) -> Dict[str, Dict]:
+        """Get entitlement settings for many applications concurrently."""
+        settings = {}
+        to_fetch = []
+        for app in apps:
+            ineligible = self.ineligible_settings(app)
+            if ineligible:
+                settings[app['id']] = ineligible
+            else:
+                to_fetch.append(app['id'])
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            settings.update(zip(to_fetch, executor.map(self.get_entitlement_settings, to_fetch)))
+        return settings
+
+    def get_apps_with_settings(self, include_system_apps: bool = False) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """
+        Get all applications together with their entitlement settings.
+
+        Settings lookups are submitted as each page of apps arrives, so they
+        run while the following pages are fetched.
+        Okta's pagination cursor is opaque, so pages themselves are still
+        fetched one after another.
+        """
+        apps = []
+        settings = {}
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            for app in self.iter_all_apps():
+                if not include_system_apps and self.is_system_app(app):
+                    continue
+                apps.append(app)
+                ineligible = self.ineligible_settings(app)
+                if ineligible:
+                    settings[app['id']] = ineligible
+                else:
+                    futures[app['id']] = executor.submit(self.get_entitlement_settings, app['id'])
+            for app_id, future in futures.items():
+                settings[app_id] = future.result()
+        return apps, settings
+
+    def set_entitlement_management_bulk(
+        self, app_ids: List[str], enabled: bool, dry_run: bool = False
+    ) -> List[Dict]:
+        """
+        Enable or disable entitlement management for many applications concurrently.
+
+        Returns one result dictionary per app, in the same order as app_ids.
+        """
+        action = self.enable_entitlement_management if enabled else self.disable_entitlement_management
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            return list(executor.map(lambda app_id: action(app_id, dry_run=dry_run), app_ids))
+
     def enable_entitlement_management(self, app_id: str, dry_run: bool = False) -> Dict:
         """
         Enable entitlement management for an application.
@@ -201,11 +397,7 @@ class EntitlementSettingsManager:
             "enabled": True
         }
 
-        response = self.api.session.post(url, json=payload)
-
-        if response.status_code == 429:
-            self.api._handle_rate_limit(response)
-            return self.enable_entitlement_management(app_id, dry_run)
+        response = self._request("POST", url, json=payload)
 
         if response.ok:
             return {
@@ -222,7 +414,7 @@ class EntitlementSettingsManager:
             # Try alternative endpoint format
             url_alt = f"{self.governance_url}/entitlement-settings/{app_id}"
             payload_alt = {"enabled": True}
-            response_alt = self.api.session.put(url_alt, json=payload_alt)
+            response_alt = self._request("PUT", url_alt, json=payload_alt)
 
             if response_alt.ok:
                 return {
@@ -266,11 +458,7 @@ class EntitlementSettingsManager:
         url = f"{self.governance_url}/entitlement-settings/{app_id}"
 
         # Try DELETE first
-        response = self.api.session.delete(url)
-
-        if response.status_code == 429:
-            self.api._handle_rate_limit(response)
-            return self.disable_entitlement_management(app_id, dry_run)
+        response = self._request("DELETE", url)
 
         if response.ok or response.status_code == 204:
             return {
@@ -285,7 +473,7 @@ class EntitlementSettingsManager:
         elif response.status_code == 400:
             # Try PUT with enabled=false
             payload = {"enabled": False}
-            response_put = self.api.session.put(url, json=payload)
+            response_put = self._request("PUT", url, json=payload)
 
             if response_put.ok:
                 return {
@@ -306,14 +494,33 @@ class EntitlementSettingsManager:
             }
 
 
+def resolve_target_apps(manager: EntitlementSettingsManager,
+                        app_id: Optional[str], app_label: Optional[str]) -> List[Dict]:
+    """Look up the app(s) selected by --app-id or --app-label, exiting if none match."""
+    if app_id:
+        app = manager.get_app_by_id(app_id)
+        if not app:
+            print(f"Error: App with ID {app_id} not found")
+            sys.exit(1)
+        return [app]
+
+    target_apps = manager.filter_apps_by_label(manager.get_all_apps(), app_label)
+    if not target_apps:
+        print(f"No apps found matching pattern: {app_label}")
+        sys.exit(1)
+    return target_apps
+
+
 def print_apps_table(apps: List[Dict], settings: Dict[str, Dict]):
     """Print apps in a formatted table with entitlement status."""
-    print(f"\n{'ID':<25} {'Label':<40} {'Entitlement Mgmt':<20} {'Status':<10}")
-    print("=" * 100)
+    rows = [
+        f"\n{'ID':<25} {'Label':<40} {'Entitlement Mgmt':<20} {'Status':<10}",
+        "=" * 100,
+    ]
 
     for app in apps:
         app_id = app.get('id', 'N/A')
-        label = app.get('label', 'N/A')[:38]
+        label = (app.get('label') or 'N/A')[:38]
         status = app.get('status', 'N/A')
 
         setting = settings.get(app_id, {})
@@ -329,9 +536,10 @@ def print_apps_table(apps: List[Dict], settings: Dict[str, Dict]):
         else:
             em_display = em_status
 
-        print(f"{app_id:<25} {label:<40} {em_display:<20} {status:<10}")
+        rows.append(f"{app_id:<25} {label:<40} {em_display:<20} {status:<10}")
 
-    print("=" * 100)
+    rows.append("=" * 100)
+    sys.stdout.write("\n".join(rows) + "\n")
 
 
 def main():
@@ -369,6 +577,11 @@ def main():
         action="store_true",
         help="Include system apps in operations (not recommended)"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always fetch the app list from Okta instead of the short-lived local cache"
+    )
 
     args = parser.parse_args()
 
@@ -381,21 +594,13 @@ def main():
         print("Error: OKTA_ORG_NAME and OKTA_API_TOKEN environment variables required")
         sys.exit(1)
 
-    manager = EntitlementSettingsManager(org_name, base_url, api_token)
+    manager = EntitlementSettingsManager(org_name, base_url, api_token, use_cache=not args.no_cache)
 
     # Handle actions
     if args.action == "list":
-        print(f"Fetching applications from {org_name}...")
-        apps = manager.get_all_apps()
-
-        # Filter out system apps unless specifically included
-        if not args.include_system_apps:
-            apps = [app for app in apps if not manager.is_system_app(app)]
-
-        print(f"Checking entitlement settings for {len(apps)} apps...")
-        settings = {}
-        for app in apps:
-            settings[app['id']] = manager.get_entitlement_settings(app['id'])
+        print(f"Fetching applications and entitlement settings from {org_name}...")
+        # System apps are filtered out unless specifically included
+        apps, settings = manager.get_apps_with_settings(args.include_system_apps)
 
         if args.json:
             output = [
@@ -419,23 +624,11 @@ def main():
             print("Error: --app-id or --app-label required for status action")
             sys.exit(1)
 
-        target_apps = []
-        if args.app_id:
-            app = manager.get_app_by_id(args.app_id)
-            if app:
-                target_apps = [app]
-            else:
-                print(f"Error: App with ID {args.app_id} not found")
-                sys.exit(1)
-        elif args.app_label:
-            all_apps = manager.get_all_apps()
-            target_apps = manager.filter_apps_by_label(all_apps, args.app_label)
-            if not target_apps:
-                print(f"No apps found matching pattern: {args.app_label}")
-                sys.exit(1)
+        target_apps = resolve_target_apps(manager, args.app_id, args.app_label)
 
+        all_settings = manager.get_entitlement_settings_bulk(target_apps)
         for app in target_apps:
-            settings = manager.get_entitlement_settings(app['id'])
+            settings = all_settings[app['id']]
             if args.json:
                 print(json.dumps({
                     "app_id": app['id'],
@@ -455,20 +648,7 @@ def main():
             print("Error: --app-id or --app-label required for enable/disable action")
             sys.exit(1)
 
-        target_apps = []
-        if args.app_id:
-            app = manager.get_app_by_id(args.app_id)
-            if app:
-                target_apps = [app]
-            else:
-                print(f"Error: App with ID {args.app_id} not found")
-                sys.exit(1)
-        elif args.app_label:
-            all_apps = manager.get_all_apps()
-            target_apps = manager.filter_apps_by_label(all_apps, args.app_label)
-            if not target_apps:
-                print(f"No apps found matching pattern: {args.app_label}")
-                sys.exit(1)
+        target_apps = resolve_target_apps(manager, args.app_id, args.app_label)
 
         # Filter system apps
         if not args.include_system_apps:
@@ -483,13 +663,14 @@ def main():
 
         results = {"success": 0, "errors": 0, "skipped": 0}
 
-        for app in target_apps:
-            app_label = app.get('label', app['id'])
+        action_results = manager.set_entitlement_management_bulk(
+            [app['id'] for app in target_apps],
+            enabled=args.action == "enable",
+            dry_run=args.dry_run
+        )
 
-            if args.action == "enable":
-                result = manager.enable_entitlement_management(app['id'], dry_run=args.dry_run)
-            else:
-                result = manager.disable_entitlement_management(app['id'], dry_run=args.dry_run)
+        for app, result in zip(target_apps, action_results):
+            app_label = app.get('label') or app['id']
 
             status = result.get('status')
             if status in ['success', 'dry_run', 'already_enabled', 'not_enabled']: